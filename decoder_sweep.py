@@ -0,0 +1,279 @@
+"""Offline sweep of the letter decoder's confidence threshold and hold time.
+
+``IconUI.process_landmarks`` commits a letter once the same prediction stays
+above ``confidence_threshold`` for ``letter_hold_duration`` seconds. This
+tool replays recorded softmax streams through that rule for a whole grid of
+settings at once: every step is a NumPy operation over a
+(thresholds, holds, frames) array, so the grid costs about the same as a
+single replay. Each setting is scored by character error rate against the
+ground-truth text and by commit latency: the time from a letter's onset,
+the first frame the model predicts it, to the frame it is committed.
+
+Streams are recorded in the overlay with Ctrl+R and saved as ``.npz`` files
+holding ``timestamps``, ``probs`` and ``labels``. The ground truth is the
+``text`` field when it is set, otherwise a ``.txt`` file with the same name.
+Example:
+
+    python decoder_sweep.py ~/.arsl/recordings/*.npz --max-cer 0.05
+"""
+import argparse
+import os
+
+import numpy as np
+
+from word_completion import normalize
+
+
+class StreamRecorder:
+    """Collect the per-frame probabilities the decoder sees"""
+    def __init__(self):
+        self.timestamps = []
+        self.probs = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, probs):
+        self.timestamps.append(timestamp)
+        self.probs.append(np.array(probs, dtype=np.float32))
+
+    def save(self, path, labels, text="", decoded=""):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            timestamps=np.array(self.timestamps, dtype=np.float64),
+            probs=np.stack(self.probs) if self.probs else np.zeros((0, len(labels)), dtype=np.float32),
+            labels=np.array(labels),
+            text=np.array(text),
+            decoded=np.array(decoded)
+        )
+
+
+def load_stream(path):
+    """Return (timestamps, probs, labels, ground truth text)"""
+    with np.load(path) as data:
+        text = str(data["text"]) if "text" in data.files else ""
+        stream = (data["timestamps"], data["probs"], [str(label) for label in data["labels"]])
+    if not text:
+        text_path = os.path.splitext(path)[0] + '.txt'
+        if os.path.exists(text_path):
+            with open(text_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+    return stream + (text,)
+
+
+def replay_grid(timestamps, letters, conf, thresholds, holds):
+    """Replay the hold-to-commit rule for every (threshold, hold) pair.
+
+    Returns a (thresholds, holds, frames) mask of the frames where a letter
+    is committed.
+    """
+    num_frames = len(timestamps)
+    frames = np.arange(num_frames)
+
+    # A run is a stretch of confident frames predicting the same letter; a
+    # low-confidence frame or a different letter starts a new one
+    valid = conf[None, :] >= thresholds[:, None]
+    continues = np.zeros_like(valid)
+    continues[:, 1:] = valid[:, 1:] & valid[:, :-1] & (letters[1:] == letters[:-1])[None, :]
+    run_start = np.maximum.accumulate(np.where(valid & ~continues, frames, 0), axis=1)
+    held = timestamps[None, :] - timestamps[run_start]
+
+    # The first frame of each run whose hold time reaches the duration. The
+    # frame that starts a run only starts the timer, even with a zero hold
+    reached = continues[:, None, :] & (held[:, None, :] >= holds[None, :, None])
+    first = reached.copy()
+    first[:, :, 1:] &= ~(reached[:, :, :-1] & continues[:, None, 1:])
+
+    # A run that reaches the hold time only commits when its letter differs
+    # from the previous such run, as last_added_letter does in the overlay
+    last = np.maximum.accumulate(np.where(first, frames, -1).astype(np.int32), axis=2)
+    previous = np.full_like(last, -1)
+    previous[:, :, 1:] = last[:, :, :-1]
+    repeated = (previous >= 0) & (letters[np.maximum(previous, 0)] == letters[None, None, :])
+    return first & ~repeated
+
+
+def commit_latency(timestamps, letters, committed):
+    """Seconds from each committed letter's onset to its commit.
+
+    The onset is the first frame of the unbroken stretch of frames whose
+    top prediction is the committed letter, confident or not, but never
+    earlier than the frame after the previous commit. Returns an array
+    shaped like ``committed`` that is zero where nothing is committed.
+    """
+    frames = np.arange(len(timestamps))
+    changed = np.ones(len(letters), dtype=bool)
+    changed[1:] = letters[1:] != letters[:-1]
+    streak_start = np.maximum.accumulate(np.where(changed, frames, 0))
+
+    last = np.maximum.accumulate(np.where(committed, frames, -1), axis=-1)
+    after_previous = np.zeros_like(last)
+    after_previous[..., 1:] = last[..., :-1] + 1
+    onset = np.maximum(streak_start, after_previous)
+    return np.where(committed, timestamps - timestamps[onset], 0.0)
+
+
+def replay_scalar(timestamps, letters, conf, threshold, hold):
+    """Frame-by-frame replay of one setting, mirroring process_landmarks"""
+    current, start, last_added = None, None, None
+    commits = []
+    for t in range(len(timestamps)):
+        if conf[t] >= threshold:
+            if letters[t] == current:
+                if timestamps[t] - start >= hold and letters[t] != last_added:
+                    commits.append(t)
+                    last_added = letters[t]
+            else:
+                current, start = letters[t], timestamps[t]
+        else:
+            current, start = None, None
+    return commits
+
+
+def edit_distances(decoded, lengths, truth):
+    """Levenshtein distance of every decoded string to ``truth`` at once.
+
+    ``decoded`` is a (settings, max length) array of character codes. Rows
+    of the dynamic programme are computed for all settings together; the
+    in-row insertion chain is a running minimum.
+    """
+    num_settings, max_len = decoded.shape
+    size = len(truth)
+    columns = np.arange(size + 1)
+    row = np.tile(columns, (num_settings, 1))
+    distances = np.where(lengths == 0, size, 0)
+    for i in range(1, max_len + 1):
+        substitute = row[:, :-1] + (decoded[:, i - 1][:, None] != truth[None, :])
+        delete = row[:, 1:] + 1
+        best = np.concatenate([np.full((num_settings, 1), i), np.minimum(substitute, delete)], axis=1)
+        row = np.minimum.accumulate(best - columns, axis=1) + columns
+        done = lengths == i
+        distances[done] = row[done, -1]
+    return distances
+
+
+def to_codes(text):
+    return np.array([ord(c) for c in text], dtype=np.int32)
+
+
+def sweep(paths, thresholds, holds, chunk_frames=5_000_000):
+    """Aggregate errors, truth length, commit count and latency per setting"""
+    shape = (len(thresholds), len(holds))
+    errors = np.zeros(shape)
+    truth_chars = 0
+    commits = np.zeros(shape)
+    latency = np.zeros(shape)
+
+    for path in paths:
+        timestamps, probs, labels, text = load_stream(path)
+        if not text:
+            print(f"Skipping {path}: no ground-truth text")
+            continue
+        if len(timestamps) == 0:
+            continue
+        letters = np.argmax(probs, axis=1)
+        conf = probs[np.arange(len(probs)), letters]
+        truth = to_codes(normalize("".join(text.split())))
+        truth_chars += len(truth)
+
+        # Bound memory by replaying a block of thresholds at a time
+        block = max(1, chunk_frames // (len(holds) * len(timestamps)))
+        for a0 in range(0, len(thresholds), block):
+            committed = replay_grid(timestamps, letters, conf, thresholds[a0:a0 + block], holds)
+            count = committed.sum(axis=2)
+            commits[a0:a0 + block] += count
+            latency[a0:a0 + block] += commit_latency(timestamps, letters, committed).sum(axis=2)
+
+            # Decoded text per setting, padded into one array of codes
+            a_idx, b_idx, t_idx = np.nonzero(committed)
+            settings = a_idx * len(holds) + b_idx
+            strings = [""] * (committed.shape[0] * len(holds))
+            for setting, t in zip(settings, t_idx):
+                strings[setting] += labels[letters[t]]
+            strings = [normalize(s) for s in strings]
+            lengths = np.array([len(s) for s in strings])
+            decoded = np.zeros((len(strings), max(1, lengths.max())), dtype=np.int32)
+            for s, string in enumerate(strings):
+                decoded[s, :len(string)] = to_codes(string)
+            errors[a0:a0 + block] += edit_distances(decoded, lengths, truth).reshape(count.shape)
+
+    if truth_chars == 0:
+        return None
+    cer = errors / truth_chars
+    mean_latency = np.divide(latency, commits, out=np.full(shape, np.nan), where=commits > 0)
+    return cer, mean_latency, commits
+
+
+def check(paths, thresholds, holds):
+    """Compare the vectorized replay with the scalar one on every setting"""
+    for path in paths:
+        timestamps, probs, _, _ = load_stream(path)
+        letters = np.argmax(probs, axis=1)
+        conf = probs[np.arange(len(probs)), letters]
+        committed = replay_grid(timestamps, letters, conf, thresholds, holds)
+        for a, threshold in enumerate(thresholds):
+            for b, hold in enumerate(holds):
+                expected = replay_scalar(timestamps, letters, conf, threshold, hold)
+                if list(np.nonzero(committed[a, b])[0]) != expected:
+                    print(f"Mismatch in {path} at threshold={threshold:g} hold={hold:g}")
+                    return False
+    print("Vectorized replay matches the frame-by-frame replay")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep decoder threshold and hold time over recordings")
+    parser.add_argument('streams', nargs='+', help="Recorded .npz prediction streams")
+    parser.add_argument('--thresholds', type=float, nargs=3, default=[0.50, 0.99, 0.01],
+                        metavar=('START', 'STOP', 'STEP'))
+    parser.add_argument('--holds', type=float, nargs=3, default=[0.2, 3.0, 0.1],
+                        metavar=('START', 'STOP', 'STEP'), help="Hold durations in seconds")
+    parser.add_argument('--max-cer', type=float, default=0.05,
+                        help="Pick the fastest setting at or below this character error rate")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--csv')
+    parser.add_argument('--check', action='store_true',
+                        help="Verify the vectorized replay against a frame-by-frame one")
+    args = parser.parse_args()
+
+    thresholds = np.round(np.arange(args.thresholds[0], args.thresholds[1] + 1e-9, args.thresholds[2]), 4)
+    holds = np.round(np.arange(args.holds[0], args.holds[1] + 1e-9, args.holds[2]), 4)
+
+    if args.check and not check(args.streams, thresholds, holds):
+        return
+
+    result = sweep(args.streams, thresholds, holds)
+    if result is None:
+        print("No stream with ground-truth text")
+        return
+    cer, latency, commits = result
+
+    rows = [(cer[a, b], latency[a, b], thresholds[a], holds[b], int(commits[a, b]))
+            for a in range(len(thresholds)) for b in range(len(holds))]
+    rows.sort(key=lambda r: (r[0], np.nan_to_num(r[1], nan=np.inf)))
+
+    print(f"{len(thresholds)} thresholds x {len(holds)} hold durations\n")
+    print(f"{'threshold':>10s}{'hold s':>8s}{'CER':>8s}{'latency s':>11s}{'commits':>9s}")
+    for c, l, threshold, hold, n in rows[:args.top]:
+        print(f"{threshold:>10.2f}{hold:>8.2f}{c:>8.1%}{l:>11.2f}{n:>9d}")
+
+    eligible = [r for r in rows if r[0] <= args.max_cer and not np.isnan(r[1])]
+    if eligible:
+        c, l, threshold, hold, _ = min(eligible, key=lambda r: r[1])
+        print(f"\nFastest at CER <= {args.max_cer:.0%}: confidence_threshold={threshold:.2f}, "
+              f"letter_hold_duration={hold:.2f} (CER {c:.1%}, commits after {l:.2f}s)")
+    else:
+        print(f"\nNo setting reaches CER <= {args.max_cer:.0%}")
+
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8') as f:
+            f.write("threshold,hold_s,cer,latency_s,commits\n")
+            for c, l, threshold, hold, n in rows:
+                f.write(f"{threshold},{hold},{c},{l},{n}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Near-duplicate detection and compaction over cached landmark features.
+
+Augmented copies and consecutive video frames produce samples whose hand
+landmarks are almost identical. Left in, they slow down training and, when
+they land on both sides of a random split, inflate test accuracy. This tool
+normalizes every 42-value vector for position and scale, groups samples
+within ``--tolerance`` of a representative through a KD-tree, and keeps one
+sample per cluster. Clusters are bounded in radius, so slowly drifting
+frames are not chained into one. The split uses coarser groups: every pair
+within ``--group-radius`` is linked, chains included, and whole groups go
+to train or test so neighbouring clusters of one hand stay on one side.
+Leakage is reported at ``--leak-radius``, wider than both. Example:
+
+    python dedupe_dataset.py features.npz --out features_compact.npz
+    python evaluate_models.py features_compact.npz
+"""
+import argparse
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+
+from landmark_features import load_features, save_features
+
+
+def normalize_landmarks(X):
+    """Shift each hand to its bounding box corner and scale it to unit size"""
+    points = X.reshape(len(X), 21, 2)
+    points = points - points.min(axis=1, keepdims=True)
+    extent = points.max(axis=(1, 2), keepdims=True)
+    extent[extent == 0] = 1.0
+    return (points / extent).reshape(len(X), 42)
+
+
+def find_clusters(X, tolerance):
+    """Cluster id per sample, each cluster within ``tolerance`` of its representative.
+
+    Samples are visited in order; an unassigned sample becomes a
+    representative and takes every still unassigned sample within
+    ``tolerance`` of it. Members are never linked through each other, so a
+    cluster's diameter is at most twice the tolerance. The representative is
+    the cluster's first sample, and its index is the cluster id.
+    """
+    tree = cKDTree(X)
+    clusters = np.full(len(X), -1, dtype=np.int64)
+    for i in range(len(X)):
+        if clusters[i] >= 0:
+            continue
+        neighbours = np.asarray(tree.query_ball_point(X[i], r=tolerance), dtype=np.int64)
+        clusters[neighbours[clusters[neighbours] < 0]] = i
+    return clusters
+
+
+def find_groups(X, radius):
+    """Group id per sample, linking every pair closer than ``radius`` transitively"""
+    pairs = cKDTree(X).query_pairs(r=radius, output_type='ndarray')
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+        shape=(len(X), len(X))
+    )
+    _, groups = connected_components(graph, directed=False)
+    return groups
+
+
+def diameter(points, block=1024):
+    """Largest pairwise distance, computed in blocks to bound memory"""
+    largest = 0.0
+    for start in range(0, len(points), block):
+        largest = max(largest, float(cdist(points[start:start + block], points).max()))
+    return largest
+
+
+def compact(clusters, y):
+    """Index of the first sample of every (cluster, label) group"""
+    keys = clusters.astype(np.int64) * (int(y.max()) + 1) + y
+    _, first = np.unique(keys, return_index=True)
+    return np.sort(first)
+
+
+def split_clusters(clusters, y, test_size, seed):
+    """Assign whole clusters (or groups) to test until each class reaches its test share"""
+    rng = np.random.default_rng(seed)
+    labels, counts = np.unique(y, return_counts=True)
+    target = dict(zip(labels, np.round(counts * test_size)))
+    taken = dict.fromkeys(labels, 0)
+
+    # Clusters almost always hold a single label, so count each one against
+    # the class of its first sample
+    cluster_ids, first, sizes = np.unique(clusters, return_index=True, return_counts=True)
+    test_clusters = set()
+    for i in rng.permutation(len(cluster_ids)):
+        label = y[first[i]]
+        if taken[label] < target[label]:
+            test_clusters.add(cluster_ids[i])
+            taken[label] += sizes[i]
+    return np.isin(clusters, list(test_clusters)).astype(np.int8)
+
+
+def leaked_fraction(X, test_mask, tolerance):
+    """Share of test samples that have a train sample within ``tolerance``"""
+    train, test = X[test_mask == 0], X[test_mask == 1]
+    if not len(test) or not len(train):
+        return 0.0
+    distances, _ = cKDTree(train).query(test, distance_upper_bound=tolerance)
+    return float(np.isfinite(distances).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate landmark samples")
+    parser.add_argument('features', help="Feature cache from landmark_features.py")
+    parser.add_argument('--dataset', help="Dataset to extract features from if the cache is missing")
+    parser.add_argument('--out', default='features_compact.npz')
+    parser.add_argument('--tolerance', type=float, default=0.03,
+                        help="Euclidean distance between normalized vectors treated as duplicate")
+    parser.add_argument('--group-radius', type=float,
+                        help="Linkage radius of the groups kept on one side of the split "
+                             "(default: 2x tolerance)")
+    parser.add_argument('--leak-radius', type=float,
+                        help="Distance at which a train sample counts as leaking into test "
+                             "(default: 3x tolerance)")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    group_radius = args.group_radius or 2 * args.tolerance
+    leak_radius = args.leak_radius or 3 * args.tolerance
+    if group_radius < args.tolerance:
+        parser.error("--group-radius must be at least --tolerance")
+
+    data = load_features(args.features, args.dataset)
+    X, y = data["X"].astype(np.float32), data["y"]
+    normalized = normalize_landmarks(X)
+
+    clusters = find_clusters(normalized, args.tolerance)
+    cluster_ids, sizes = np.unique(clusters, return_counts=True)
+    largest = cluster_ids[np.argmax(sizes)]
+
+    # Groups are built on every sample before compaction. A cluster lies
+    # within the tolerance of its representative, so it never spans groups
+    groups = find_groups(normalized, group_radius)
+    group_sizes = np.unique(groups, return_counts=True)[1]
+
+    keep = compact(clusters, y)
+    split = split_clusters(groups[keep], y[keep], args.test_size, args.seed)
+
+    # How much a plain random split of the same samples leaks, for comparison
+    rng = np.random.default_rng(args.seed)
+    random_split = (rng.random(len(keep)) < args.test_size).astype(np.int8)
+    random_leak = leaked_fraction(normalized[keep], random_split, leak_radius)
+
+    paths = data["paths"][keep] if "paths" in data else None
+    save_features(args.out, X[keep], y[keep], paths,
+                  cluster=clusters[keep], group=groups[keep], split=split)
+
+    reduction = 1 - len(keep) / len(X)
+    print(f"Samples:        {len(X)}")
+    print(f"Clusters:       {len(cluster_ids)} within {args.tolerance:g} of their representative")
+    print(f"Largest:        {sizes.max()} samples, diameter "
+          f"{diameter(normalized[clusters == largest]):.3f}")
+    print(f"Kept:           {len(keep)} ({reduction:.1%} smaller)")
+    print(f"Split groups:   {len(group_sizes)} linked within {group_radius:g}, "
+          f"largest {group_sizes.max()} samples")
+    print(f"Split:          {int((split == 0).sum())} train / {int(split.sum())} test")
+    print(f"Test samples with a train sample within {leak_radius:g}: "
+          f"{random_leak:.1%} with a random split, "
+          f"{leaked_fraction(normalized[keep], split, leak_radius):.1%} now")
+    print(f"Saved to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""Evaluate every candidate model family on the same features and split.
+
+Each family trains and is saved in its own worker process on the cached
+landmark features from ``landmark_features.py``. Once every worker has
+finished, the saved models are reloaded and timed one after another through
+the same ``LoadedModel`` wrapper the overlay uses, so no measurement shares
+the machine with training. The result is a table of
+accuracy against latency with the Pareto-optimal models marked, so the
+shipped model is picked on both speed and accuracy. Example:
+
+    python evaluate_models.py features.npz --families rf xgb cnn --csv eval.csv
+    python model_registry.py register eval_models/cnn.h5 --activate
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from landmark_features import load_features
+from model_registry import DEFAULT_LABELS, LoadedModel, load_model_file
+
+
+def train_random_forest(X_train, y_train, num_classes, args):
+    from sklearn.ensemble import RandomForestClassifier
+    model = RandomForestClassifier(random_state=args.seed, n_jobs=args.threads)
+    model.fit(X_train, y_train)
+    # Train on the worker's cores, but save and time it as the overlay runs it
+    model.set_params(n_jobs=1)
+    return model
+
+
+def train_xgboost(X_train, y_train, num_classes, args):
+    from xgboost import XGBClassifier
+    model = XGBClassifier(random_state=args.seed, n_jobs=args.threads)
+    model.fit(X_train, y_train)
+    model.set_params(n_jobs=1)
+    return model
+
+
+def train_cnn(X_train, y_train, num_classes, args):
+    """The Conv1D network from ARSL_Project.ipynb"""
+    import tensorflow as tf
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout, BatchNormalization, Conv1D, GlobalAveragePooling1D
+    from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+    from tensorflow.keras.utils import to_categorical
+
+    tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+    tf.random.set_seed(args.seed)
+
+    model = Sequential([
+        Conv1D(128, kernel_size=3, activation='relu', input_shape=(42, 1), padding='same'),
+        BatchNormalization(),
+        Conv1D(256, kernel_size=3, activation='relu', padding='same'),
+        BatchNormalization(),
+        Conv1D(512, kernel_size=3, activation='relu', padding='same'),
+        BatchNormalization(),
+        Conv1D(512, kernel_size=3, activation='relu', padding='same'),
+        BatchNormalization(),
+        GlobalAveragePooling1D(),
+        Dense(1024, activation='relu'),
+        Dropout(0.5),
+        Dense(512, activation='relu'),
+        Dropout(0.4),
+        Dense(256, activation='relu'),
+        Dropout(0.3),
+        Dense(num_classes, activation='softmax')
+    ], name="Arabic_Sign_Language_CNN1D")
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss='categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    # Validate on a slice of the training set so the test split stays unseen
+    model.fit(
+        X_train.reshape(-1, 42, 1), to_categorical(y_train, num_classes),
+        epochs=args.epochs,
+        batch_size=128,
+        validation_split=0.1,
+        callbacks=[
+            EarlyStopping(monitor='val_accuracy', patience=10, restore_best_weights=True),
+            ReduceLROnPlateau(monitor='val_accuracy', factor=0.5, patience=5),
+        ],
+        verbose=0
+    )
+    return model
+
+
+def save_pickle(model, path):
+    import pickle
+    with open(path, 'wb') as f:
+        pickle.dump({'model': model}, f)
+
+
+def save_keras(model, path):
+    model.save(path)
+
+
+# name: (train, save, file extension, backend, input layout)
+FAMILIES = {
+    "rf": (train_random_forest, save_pickle, ".p", "sklearn", "flat"),
+    "xgb": (train_xgboost, save_pickle, ".p", "sklearn", "flat"),
+    "cnn": (train_cnn, save_keras, ".h5", "keras", "conv1d"),
+}
+
+
+def predict_batch(loaded, X, batch_size):
+    """Class indices for many samples at once"""
+    if loaded.backend == "keras":
+        probs = loaded.model.predict(X.reshape(-1, 42, 1), batch_size=batch_size, verbose=0)
+    else:
+        probs = loaded.model.predict_proba(X)
+    return np.argmax(probs, axis=1)
+
+
+def train_family(name, features_path, train_idx, args):
+    """Train and save one model family; runs in a worker process"""
+    train, save, extension, _, _ = FAMILIES[name]
+    data = load_features(features_path)
+    classes, y = np.unique(data["y"], return_inverse=True)
+    X = data["X"].astype(np.float32)
+
+    start = time.perf_counter()
+    model = train(X[train_idx], y[train_idx], len(classes), args)
+    train_time = time.perf_counter() - start
+
+    path = os.path.join(args.out_dir, name + extension)
+    save(model, path)
+    return {"family": name, "train_s": train_time, "path": path}
+
+
+def time_family(trained, X_test, y_test, classes, args):
+    """Reload a saved model and measure accuracy, latency and load time.
+
+    Runs in the main process after training has finished, one family at a
+    time, so the timings are not skewed by other workers.
+    """
+    name, path = trained["family"], trained["path"]
+    _, _, _, backend, input_layout = FAMILIES[name]
+    size_kb = os.path.getsize(path) / 1024
+
+    start = time.perf_counter()
+    labels = [DEFAULT_LABELS[c] if c < len(DEFAULT_LABELS) else str(c) for c in classes]
+    loaded = LoadedModel(load_model_file(path, backend), labels, input_layout, backend, name)
+    loaded.warm_up()
+    load_time = time.perf_counter() - start
+
+    accuracy = float(np.mean(predict_batch(loaded, X_test, args.batch_size) == y_test))
+
+    # Single-sample latency through the same call the overlay makes per frame
+    latencies = []
+    for i in range(args.latency_runs):
+        sample = loaded.prepare(X_test[i % len(X_test)])
+        tick = time.perf_counter()
+        loaded.predict(sample)
+        latencies.append(time.perf_counter() - tick)
+
+    start = time.perf_counter()
+    predict_batch(loaded, X_test, args.batch_size)
+    throughput = len(X_test) / (time.perf_counter() - start)
+
+    return {
+        "family": name,
+        "accuracy": accuracy,
+        "latency_ms": float(np.median(latencies)) * 1000,
+        "p99_latency_ms": float(np.percentile(latencies, 99)) * 1000,
+        "throughput_sps": throughput,
+        "size_kb": size_kb,
+        "load_s": load_time,
+        "train_s": trained["train_s"],
+        "path": path,
+    }
+
+
+def pareto_front(results):
+    """Mark results no other result beats on both accuracy and latency"""
+    for result in results:
+        result["pareto"] = not any(
+            other["accuracy"] >= result["accuracy"]
+            and other["latency_ms"] <= result["latency_ms"]
+            and (other["accuracy"] > result["accuracy"] or other["latency_ms"] < result["latency_ms"])
+            for other in results
+        )
+    return results
+
+
+def print_table(results):
+    print(f"\n{'':2s}{'family':8s}{'accuracy':>10s}{'latency ms':>12s}{'p99 ms':>9s}"
+          f"{'samples/s':>11s}{'size KB':>10s}{'load s':>8s}{'train s':>9s}")
+    for r in sorted(results, key=lambda r: -r["accuracy"]):
+        print(f"{'*' if r['pareto'] else ' ':2s}{r['family']:8s}{r['accuracy']:>10.2%}"
+              f"{r['latency_ms']:>12.3f}{r['p99_latency_ms']:>9.3f}{r['throughput_sps']:>11.0f}"
+              f"{r['size_kb']:>10.0f}{r['load_s']:>8.2f}{r['train_s']:>9.1f}")
+    print("* Pareto-optimal on accuracy vs. single-sample latency")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model families on speed and accuracy")
+    parser.add_argument('features', help="Feature cache from landmark_features.py")
+    parser.add_argument('--dataset', help="Dataset to extract features from if the cache is missing")
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=list(FAMILIES))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--latency-runs', type=int, default=500)
+    parser.add_argument('--out-dir', default='eval_models')
+    parser.add_argument('--csv')
+    args = parser.parse_args()
+
+    data = load_features(args.features, args.dataset)
+    indices = np.arange(len(data["y"]))
+    if "split" in data:
+        # Leakage-free split written by dedupe_dataset.py
+        train_idx, test_idx = indices[data["split"] == 0], indices[data["split"] == 1]
+    else:
+        from sklearn.model_selection import train_test_split
+        train_idx, test_idx = train_test_split(
+            indices, test_size=args.test_size, random_state=args.seed, stratify=data["y"])
+    print(f"{len(train_idx)} train / {len(test_idx)} test samples, "
+          f"{len(np.unique(data['y']))} classes")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    workers = args.workers or min(len(args.families), os.cpu_count() or 1)
+    # Share the cores between workers so parallel families don't oversubscribe
+    args.threads = max(1, (os.cpu_count() or 1) // workers)
+
+    trained = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(train_family, name, args.features, train_idx, args): name
+            for name in args.families
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                trained.append(future.result())
+                print(f"{name} trained")
+            except ImportError as e:
+                print(f"{name} skipped: {e}")
+            except Exception as e:
+                print(f"{name} failed: {e}")
+
+    classes, y = np.unique(data["y"], return_inverse=True)
+    X_test, y_test = data["X"][test_idx].astype(np.float32), y[test_idx]
+    results = []
+    for entry in sorted(trained, key=lambda t: t["family"]):
+        try:
+            results.append(time_family(entry, X_test, y_test, classes, args))
+        except Exception as e:
+            print(f"{entry['family']} failed to load: {e}")
+
+    if not results:
+        print("No model family could be evaluated")
+        return
+    pareto_front(results)
+    print_table(results)
+
+    if args.csv:
+        columns = list(results[0])
+        with open(args.csv, 'w', encoding='utf-8') as f:
+            f.write(",".join(columns) + "\n")
+            for r in results:
+                f.write(",".join(str(r[c]) for c in columns) + "\n")
+
+
+if __name__ == '__main__':
+    main()
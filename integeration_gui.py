@@ -14,15 +14,52 @@ import speech_recognition as sr
 import sys
 import os
 
-def get_model_path():
+from personalization import SignerPersonalizer
+from model_registry import ModelRegistry, LoadedModel, DEFAULT_LABELS, get_registry_path
+from word_completion import load_completer
+from sign_assets import WORD_TO_IMAGE, SIGNS_PATH
+from decoder_sweep import StreamRecorder
+
+def get_base_path():
     if getattr(sys, 'frozen', False):
         # Running as compiled executable
-        base_path = sys._MEIPASS
-    else:
-        # Running as script
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return os.path.join(base_path, 'Arabic_Sign_Language_CNN_Final.h5')
+        return sys._MEIPASS
+    # Running as script
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def get_model_path():
+    return os.path.join(get_base_path(), 'Arabic_Sign_Language_CNN_Final.h5')
+
+
+def get_lexicon_path():
+    return os.path.join(get_base_path(), 'arabic_lexicon.txt')
+
+
+def get_calibration_path(version=None):
+    # Stored per user, the bundle directory of a frozen executable is temporary.
+    # Embeddings are only comparable within one model, so keep one file per version
+    name = f'calibration_{version}.npz' if version else 'calibration.npz'
+    return os.path.join(os.path.expanduser('~'), '.arsl', name)
+
+
+def get_recording_path():
+    name = time.strftime('stream_%Y%m%d_%H%M%S.npz')
+    return os.path.join(os.path.expanduser('~'), '.arsl', 'recordings', name)
+
+
+def build_personalizer(loaded):
+    """Create the k-NN personalizer for a loaded model, if it supports one"""
+    if loaded.backend != "keras":
+        return None
+    try:
+        personalizer = SignerPersonalizer(loaded.model, len(loaded.labels))
+        if personalizer.load(get_calibration_path(loaded.version)):
+            print(f"Calibration loaded: {len(personalizer.index)} samples")
+        return personalizer
+    except Exception as e:
+        print(f"Personalization unavailable: {e}")
+        return None
 
 
 class SignImageDisplay(QWidget):
@@ -145,6 +182,58 @@ class SignSequenceThread(QThread):
         self.is_running = False
 
 
+class ModelWatcherThread(QThread):
+    """Load newly activated registry versions in the background"""
+    model_ready = pyqtSignal(object, object)  # LoadedModel, SignerPersonalizer
+    shadow_ready = pyqtSignal(object)  # LoadedModel or None
+    error_occurred = pyqtSignal(str)
+    
+    def __init__(self, registry, version=None, shadow_version=None, poll_interval=2.0):
+        super().__init__()
+        self.registry = registry
+        self.version = version
+        self.shadow_version = shadow_version
+        self.poll_interval = poll_interval
+        self.is_running = False
+    
+    def load(self, version):
+        loaded = self.registry.load(version)
+        loaded.warm_up()
+        return loaded
+    
+    def check(self):
+        version = self.registry.active_version()
+        if version and version != self.version:
+            # Remember the version even on failure so a broken one is not retried every poll
+            self.version = version
+            try:
+                loaded = self.load(version)
+                self.model_ready.emit(loaded, build_personalizer(loaded))
+            except Exception as e:
+                self.error_occurred.emit(f"Error loading model {version}: {e}")
+        
+        shadow_version = self.registry.shadow_version()
+        if shadow_version != self.shadow_version:
+            self.shadow_version = shadow_version
+            try:
+                self.shadow_ready.emit(self.load(shadow_version) if shadow_version else None)
+            except Exception as e:
+                self.error_occurred.emit(f"Error loading shadow model {shadow_version}: {e}")
+    
+    def run(self):
+        self.is_running = True
+        while self.is_running:
+            self.check()
+            # Sleep in short steps so stop() returns quickly
+            waited = 0.0
+            while self.is_running and waited < self.poll_interval:
+                time.sleep(0.1)
+                waited += 0.1
+    
+    def stop(self):
+        self.is_running = False
+
+
 class VoiceRecognitionThread(QThread):
     result_ready = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
@@ -396,29 +485,48 @@ class IconUI(QMainWindow):
             min_detection_confidence=0.1,
             min_tracking_confidence=0.7
         )
+        self.model = None
+        self.personalizer = None
+        self.arabic_letters = list(DEFAULT_LABELS)
+        
+        # Shadow model scored side by side with the active one, never shown
+        self.shadow_model = None
+        self.shadow_frames = 0
+        self.shadow_agreements = 0
+        
+        self.registry = ModelRegistry(get_registry_path())
         try:
-            model_path = get_model_path()
-            self.model = load_model(model_path)
+            version = self.registry.active_version()
+            if version:
+                loaded = self.registry.load(version)
+            else:
+                # No registry yet, fall back to the bundled model
+                loaded = LoadedModel(load_model(get_model_path()), DEFAULT_LABELS)
+            loaded.warm_up()
+            self.set_model(loaded, build_personalizer(loaded))
             print("Model loaded successfully!")
         except Exception as e:
             print(f"Error loading model: {e}")
-            self.model = None
-        
-        self.arabic_letters = ['أ','ب','ت','ث','ج','ح','خ','د','ذ','ر','ز','س','ش','ص','ض','ط','ظ','ع','غ','ف','ق','ك','ل','م','ن','ه','و','ي','لا','ى','ة','ء']
-        self.word_to_image = {
-            "ا": "aleff.jpeg", "أ": "aleff.jpeg", "ب": "bb.jpeg", "ت": "ta.jpeg", 
-            "ث": "thea.jpeg", "ج": "jeem.jpeg", "ح": "ha.jpeg", "خ": "khaa.jpeg", 
-            "د": "daal.jpeg", "ذ": "thal.jpeg", "ر": "ra'.jpeg", "ز": "zay.jpeg", 
-            "س": "seen.jpeg", "ش": "sheen.jpeg", "ص": "saad.jpeg", "ض": "daad.jpeg",
-            "ط": "taah.jpeg", "ظ": "thaa.jpeg", "ع": "ain.jpeg", "غ": "ghain.jpeg", 
-            "ف": "fa.jpeg", "ق": "k'af.jpeg", "ك": "kaaf.jpeg", "ل": "laam.jpeg", 
-            "م": "meem.jpeg", "ن": "nun.jpeg", "ه": "haa'.jpeg", "و": "waaw.jpeg", 
-            "ي": "yaa.jpeg", "لا": "la.jpeg", "ة": "ta marboota.jpeg", 
-            "ال": "alif_lam.jpeg", "ء": "hamza.jpeg", "ى": "yaa.jpeg", " ": "space.jpeg"
-        }
-        
-        # Path to sign images
-        self.signs_path = r"D:\visual\Python\DEPI machine\Final Project\ARABIC"
+            version = None
+        
+        self.model_watcher = ModelWatcherThread(self.registry, version)
+        self.model_watcher.model_ready.connect(self.on_model_ready)
+        self.model_watcher.shadow_ready.connect(self.on_shadow_ready)
+        self.model_watcher.error_occurred.connect(print)
+        self.model_watcher.start()
+        
+        self.word_to_image = WORD_TO_IMAGE
+        
+        # Calibration mode: record a few seconds of samples per letter
+        self.is_calibrating = False
+        self.calibration_index = 0
+        self.calibration_start_time = None
+        self.calibration_seconds = 3.0
+        # Countdown before each letter so the hand can change shape unrecorded
+        self.calibration_pause = 2.0
+        self.calibration_ready_time = None
+
+        self.signs_path = SIGNS_PATH
         self.display_time = 1.0
 
         self.is_running = False
@@ -431,7 +539,25 @@ class IconUI(QMainWindow):
         self.letter_hold_duration = 2.0  # seconds
         self.confidence_threshold = 0.90
         self.collected_word = ""
+        self.max_word_length = 200  # keep only the tail so long sessions stay bounded
         self.last_added_letter = None
+        
+        # Word completion from the lexicon, fed with the top letters of each commit
+        self.word_completer = None
+        try:
+            self.word_completer = load_completer(get_lexicon_path())
+        except Exception as e:
+            print(f"Error loading lexicon: {e}")
+        self.completions = []
+        self.completion_start = 0  # index in collected_word where the completed word begins
+        self.completion_top_k = 5
+        
+        # Per-frame probabilities recorded for offline decoder tuning (Ctrl+R)
+        self.stream_recorder = None
+        
+        # Per-frame buffers reused across ticks
+        self.rgb_buffer = None
+        self.landmark_buffer = np.zeros(42, dtype=np.float32)
 
         self.voice_thread = None
         self.voice_indicator = VoiceIndicator()
@@ -457,7 +583,7 @@ class IconUI(QMainWindow):
         
         # Get screen geometry and position at top-middle
         screen = QApplication.primaryScreen().geometry()
-        window_width = 400
+        window_width = 480
         window_height = 150
         x = (screen.width() - window_width) // 2
         y = 0
@@ -483,6 +609,7 @@ class IconUI(QMainWindow):
         self.create_icon_button(icons_layout, "Voice", "🎤")
         self.create_icon_button(icons_layout, "Show", "👁️")
         self.create_icon_button(icons_layout, "Clear", "🗑️")
+        self.create_icon_button(icons_layout, "Calibrate", "🎯")
         
         # Create caption label at bottom of screen
         screen = QApplication.primaryScreen().geometry()
@@ -533,6 +660,25 @@ class IconUI(QMainWindow):
         
         # Keep reference to caption_label for backward compatibility
         self.caption_label = self.letter_label
+        
+        # Ctrl+Enter accepts the best completion, Ctrl+1..3 pick one.
+        # Application-wide so it works whichever overlay window has focus
+        self.completion_shortcuts = []
+        for key, index in [("Ctrl+Return", 0), ("Ctrl+1", 0), ("Ctrl+2", 1), ("Ctrl+3", 2)]:
+            shortcut = QShortcut(QKeySequence(key), self)
+            shortcut.setContext(Qt.ApplicationShortcut)
+            shortcut.activated.connect(lambda index=index: self.accept_completion(index))
+            self.completion_shortcuts.append(shortcut)
+        
+        # Ctrl+Shift+Space ends a word without a completion (Ctrl+Space
+        # already switches the capture window between resize and move)
+        self.word_break_shortcut = QShortcut(QKeySequence("Ctrl+Shift+Space"), self)
+        self.word_break_shortcut.setContext(Qt.ApplicationShortcut)
+        self.word_break_shortcut.activated.connect(self.end_word)
+        
+        self.record_shortcut = QShortcut(QKeySequence("Ctrl+R"), self)
+        self.record_shortcut.setContext(Qt.ApplicationShortcut)
+        self.record_shortcut.activated.connect(self.toggle_stream_recording)
 
         # Add widgets to main layout
         main_layout.addWidget(icons_container, stretch=1)
@@ -581,6 +727,8 @@ class IconUI(QMainWindow):
         print(f"{name} button clicked")
         if name == "Exit":
             self.stop_capture()
+            self.model_watcher.stop()
+            self.model_watcher.wait()
             self.close()
             if self.caption_label:
                 self.caption_label.close()
@@ -598,6 +746,11 @@ class IconUI(QMainWindow):
             self.toggle_capture_window()
         elif name == "Clear":
             self.clear_word()
+        elif name == "Calibrate":
+            if self.is_calibrating:
+                self.stop_calibration()
+            else:
+                self.start_calibration()
     
     def start_capture(self):
         if not self.is_running:
@@ -645,62 +798,130 @@ class IconUI(QMainWindow):
             height = screenshot.height()
             ptr = screenshot.bits()
             ptr.setsize(height * width * 4)
-            frame = np.array(ptr).reshape(height, width, 4)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
-            results = self.hands.process(rgb_frame)
+            # View the screenshot memory instead of copying it, and reuse the
+            # RGB buffer while the capture window keeps the same size
+            frame = np.frombuffer(ptr, dtype=np.uint8).reshape(height, width, 4)
+            if self.rgb_buffer is None or self.rgb_buffer.shape[:2] != (height, width):
+                self.rgb_buffer = np.empty((height, width, 3), dtype=np.uint8)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB, dst=self.rgb_buffer)
+            self.recognize_frame(rgb_frame)
             
-            if results.multi_hand_landmarks:
-                lm_list = []
-                for lm in results.multi_hand_landmarks[0].landmark:
-                    lm_list.extend([lm.x, lm.y])
-                
-                landmarks = np.array(lm_list).reshape(1, 42, 1).astype(np.float32)
-                
-                pred = self.model.predict(landmarks, verbose=0)
-                idx = np.argmax(pred)
-                conf = pred[0][idx]
-                
-                predicted_letter = self.arabic_letters[idx]
-                
-                if conf >= self.confidence_threshold:
-                    # Check if same letter as before
-                    if predicted_letter == self.current_letter:
-                        # Calculate hold duration
-                        if self.letter_start_time is not None:
-                            hold_time = time.time() - self.letter_start_time
-                            
-                            # Check if held long enough
-                            if hold_time >= self.letter_hold_duration:
-                                # Add letter to word if not already added
-                                if predicted_letter != self.last_added_letter:
-                                    self.add_letter_to_word(predicted_letter)
-                                    self.last_added_letter = predicted_letter
-                                
-                                # Show confirmed letter
-                                self.update_letter_display(f"{predicted_letter} ✓ ({conf:.0%})")
-                                self.update_word_display(self.collected_word)
-                            else:
-                                # Show progress bar
-                                progress = int((hold_time / self.letter_hold_duration) * 100)
-                                self.update_letter_display(f"{predicted_letter} ({conf:.0%}) [{progress}%]")
-                                self.update_word_display(self.collected_word)
-                    else:
-                        # New letter detected
-                        self.current_letter = predicted_letter
-                        self.letter_start_time = time.time()
-                        self.update_letter_display(f"{predicted_letter} ({conf:.0%}) [0%]")
+        except Exception as e:
+            print(f"Error processing frame: {e}")
+    
+    def recognize_frame(self, rgb_frame):
+        """Detect the hand in an RGB frame and feed its landmarks to the decoder"""
+        results = self.hands.process(rgb_frame)
+        
+        if results.multi_hand_landmarks:
+            lm_list = self.landmark_buffer
+            for i, lm in enumerate(results.multi_hand_landmarks[0].landmark):
+                lm_list[2 * i] = lm.x
+                lm_list[2 * i + 1] = lm.y
+            self.process_landmarks(lm_list)
+        else:
+            self.update_caption("لا توجد يد")
+    
+    def process_landmarks(self, lm_list):
+        """Classify 42 landmark values and update the letter hold logic"""
+        landmarks = self.model.prepare(lm_list)
+        
+        if self.personalizer:
+            embedding, probs = self.personalizer.forward(landmarks)
+            if self.is_calibrating:
+                self.record_calibration_sample(embedding)
+                return
+            probs = self.personalizer.blend(embedding, probs)
+        else:
+            probs = self.model.predict(landmarks)
+        if self.stream_recorder is not None:
+            self.stream_recorder.append(time.time(), probs)
+        
+        idx = int(np.argmax(probs))
+        conf = probs[idx]
+        
+        predicted_letter = self.arabic_letters[idx]
+        
+        if self.shadow_model:
+            self.score_shadow(lm_list, predicted_letter)
+        
+        if conf >= self.confidence_threshold:
+            # Check if same letter as before
+            if predicted_letter == self.current_letter:
+                # Calculate hold duration
+                if self.letter_start_time is not None:
+                    hold_time = time.time() - self.letter_start_time
+                    
+                    # Check if held long enough
+                    if hold_time >= self.letter_hold_duration:
+                        # Add letter to word if not already added
+                        if predicted_letter != self.last_added_letter:
+                            self.add_letter_to_word(predicted_letter, probs)
+                            self.last_added_letter = predicted_letter
+                        
+                        # Show confirmed letter
+                        self.update_letter_display(f"{predicted_letter} ✓ ({conf:.0%})")
                         self.update_word_display(self.collected_word)
-                else:
-                    # Confidence too low, reset timer
-                    self.reset_letter_timer()
-                    if conf > 0.3:
-                        self.update_letter_display(f"{predicted_letter} ({conf:.0%}) - ثقة منخفضة")
+                    else:
+                        # Show progress bar
+                        progress = int((hold_time / self.letter_hold_duration) * 100)
+                        self.update_letter_display(f"{predicted_letter} ({conf:.0%}) [{progress}%]")
                         self.update_word_display(self.collected_word)
             else:
-                self.update_caption("لا توجد يد")
-                
+                # New letter detected
+                self.current_letter = predicted_letter
+                self.letter_start_time = time.time()
+                self.update_letter_display(f"{predicted_letter} ({conf:.0%}) [0%]")
+                self.update_word_display(self.collected_word)
+        else:
+            # Confidence too low, reset timer
+            self.reset_letter_timer()
+            if conf > 0.3:
+                self.update_letter_display(f"{predicted_letter} ({conf:.0%}) - ثقة منخفضة")
+                self.update_word_display(self.collected_word)
+    
+    def set_model(self, loaded, personalizer):
+        """Make a loaded model the active one"""
+        self.model = loaded
+        self.arabic_letters = loaded.labels
+        self.personalizer = personalizer
+    
+    def on_model_ready(self, loaded, personalizer):
+        """Swap in a model loaded by the watcher.
+        
+        Runs on the GUI thread, so it can never interleave with process_frame.
+        """
+        if self.is_calibrating:
+            self.stop_calibration()
+        self.set_model(loaded, personalizer)
+        self.reset_letter_timer()
+        self.update_letter_display(f"✓ النموذج {loaded.version}")
+        print(f"Switched to model {loaded.version}")
+    
+    def on_shadow_ready(self, loaded):
+        """Start or stop scoring a shadow model next to the active one"""
+        self.shadow_model = loaded
+        self.shadow_frames = 0
+        self.shadow_agreements = 0
+        print(f"Shadow model: {loaded.version if loaded else 'off'}")
+    
+    def score_shadow(self, lm_list, predicted_letter):
+        """Compare the shadow model's letter with the active model's"""
+        try:
+            probs = self.shadow_model.predict(self.shadow_model.prepare(lm_list))
+            shadow_letter = self.shadow_model.labels[int(np.argmax(probs))]
         except Exception as e:
-            print(f"Error processing frame: {e}")
+            print(f"Shadow model error: {e}")
+            self.shadow_model = None
+            return
+        
+        self.shadow_frames += 1
+        if shadow_letter == predicted_letter:
+            self.shadow_agreements += 1
+        if self.shadow_frames % 300 == 0:
+            agreement = self.shadow_agreements / self.shadow_frames
+            print(f"Shadow {self.shadow_model.version}: {agreement:.1%} agreement "
+                  f"over {self.shadow_frames} frames")
     
     def update_caption(self, text):
         self.caption_label.setText(text)
@@ -711,7 +932,9 @@ class IconUI(QMainWindow):
     def update_word_display(self, word):
         """Update word label with Arabic reshaping"""
         try:
-            if word:
+            if word and self.completions:
+                self.word_label.setText(f"الكلمة: {word}   ({' | '.join(self.completions)})")
+            elif word:
                 
                 self.word_label.setText(f"الكلمة: {word}")
             else:
@@ -724,20 +947,143 @@ class IconUI(QMainWindow):
         self.current_letter = None
         self.letter_start_time = None
     
-    def add_letter_to_word(self, letter):
+    def add_letter_to_word(self, letter, probs=None):
         """Add a letter to the collected word"""
         self.collected_word += letter
+        
+        if self.word_completer:
+            # Beam over the most likely letters, not just the committed one
+            if probs is not None:
+                top = np.argsort(probs)[::-1][:self.completion_top_k]
+                candidates = [(self.arabic_letters[i], float(probs[i])) for i in top]
+            else:
+                candidates = [(letter, 1.0)]
+            self.word_completer.push(candidates)
+            self.completions = self.word_completer.completions()
+        
+        if len(self.collected_word) > self.max_word_length:
+            trimmed = len(self.collected_word) - self.max_word_length
+            self.collected_word = self.collected_word[trimmed:]
+            self.completion_start = max(0, self.completion_start - trimmed)
         print(f"Letter added: {letter} | Word: {self.collected_word}")
     
+    def accept_completion(self, index=0):
+        """Replace the partly signed word with one of the offered completions"""
+        if index >= len(self.completions):
+            return
+        word = self.completions[index]
+        self.collected_word = self.collected_word[:self.completion_start] + word + " "
+        self.completion_start = len(self.collected_word)
+        # The next word may start with the letter this one ended on
+        self.last_added_letter = None
+        self.reset_completions()
+        self.update_letter_display(f"✓ {word}")
+        self.update_word_display(self.collected_word)
+        print(f"Completion accepted: {word} | Word: {self.collected_word}")
+    
+    def end_word(self):
+        """Close the current word so the next letters start a new one"""
+        if self.collected_word and not self.collected_word.endswith(" "):
+            self.collected_word += " "
+        self.completion_start = len(self.collected_word)
+        self.last_added_letter = None
+        self.reset_completions()
+        self.update_word_display(self.collected_word)
+        print(f"Word ended | Word: {self.collected_word}")
+    
+    def reset_completions(self):
+        if self.word_completer:
+            self.word_completer.reset()
+        self.completions = []
+    
     def clear_word(self):
         """Clear the collected word"""
         self.collected_word = ""
         self.last_added_letter = None
+        self.completion_start = 0
+        self.reset_completions()
         self.reset_letter_timer()
         self.update_letter_display("تم المسح - جاهز للبدء")
         self.update_word_display("")
         print("Word cleared")
 
+    def start_calibration(self):
+        """Record the user's own samples for every letter, one at a time"""
+        if not self.personalizer:
+            self.update_letter_display("المعايرة غير متاحة")
+            return
+        
+        self.start_capture()
+        self.is_calibrating = True
+        self.calibration_index = 0
+        self.calibration_start_time = None
+        self.calibration_ready_time = time.time() + self.calibration_pause
+        self.reset_letter_timer()
+        self.update_letter_display(f"معايرة: {self.arabic_letters[0]}")
+        print("Calibration started")
+    
+    def record_calibration_sample(self, embedding):
+        """Store one embedding for the letter currently being calibrated"""
+        label = self.calibration_index
+        letter = self.arabic_letters[label]
+        
+        # Show the next letter and wait before recording it
+        remaining = self.calibration_ready_time - time.time()
+        if remaining > 0:
+            self.update_letter_display(f"التالي: {letter} ... {int(remaining) + 1}")
+            return
+        
+        # The clock starts on the first frame with a hand so no time is lost
+        if self.calibration_start_time is None:
+            self.calibration_start_time = time.time()
+            self.personalizer.index.remove_label(label)
+        
+        self.personalizer.add_sample(embedding, label)
+        elapsed = time.time() - self.calibration_start_time
+        
+        if elapsed >= self.calibration_seconds:
+            self.calibration_index += 1
+            self.calibration_start_time = None
+            self.calibration_ready_time = time.time() + self.calibration_pause
+            if self.calibration_index >= len(self.arabic_letters):
+                self.stop_calibration()
+                return
+            self.update_letter_display(f"التالي: {self.arabic_letters[self.calibration_index]}")
+        else:
+            progress = int((elapsed / self.calibration_seconds) * 100)
+            self.update_letter_display(f"معايرة: {letter} [{progress}%]")
+    
+    def stop_calibration(self):
+        """Finish calibration and persist the recorded samples"""
+        self.is_calibrating = False
+        self.calibration_start_time = None
+        try:
+            self.personalizer.save(get_calibration_path(self.model.version))
+            self.update_letter_display(f"✓ تمت المعايرة ({len(self.personalizer.index)})")
+            print(f"Calibration saved: {len(self.personalizer.index)} samples")
+        except Exception as e:
+            print(f"Error saving calibration: {e}")
+    
+    def toggle_stream_recording(self):
+        """Start or stop recording the decoder's input for decoder_sweep.py"""
+        if self.stream_recorder is None:
+            self.stream_recorder = StreamRecorder()
+            self.update_letter_display("⏺ تسجيل")
+            print("Stream recording started")
+            return
+        
+        recorder = self.stream_recorder
+        self.stream_recorder = None
+        path = get_recording_path()
+        try:
+            # Ground truth goes in a .txt next to the recording, the decoded
+            # word is kept only for reference
+            recorder.save(path, self.arabic_letters, decoded=self.collected_word)
+            self.update_letter_display(f"⏹ {len(recorder)} إطار")
+            print(f"Stream recording saved: {path} ({len(recorder)} frames)")
+        except Exception as e:
+            print(f"Error saving recording: {e}")
+    
     def start_voice_recognition(self):
         """Start voice recognition mode"""
         if self.voice_thread and self.voice_thread.isRunning():
@@ -781,6 +1127,8 @@ class IconUI(QMainWindow):
             # Extract the recognized text
             recognized_text = text.replace("تم التعرف:", "").strip()
             self.collected_word = recognized_text
+            self.completion_start = len(recognized_text)
+            self.reset_completions()
             self.update_letter_display("✓ تم التعرف على الصوت")
             self.update_word_display(recognized_text)
             self.voice_indicator.stop_animation()
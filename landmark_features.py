@@ -0,0 +1,126 @@
+"""Shared landmark feature extraction and caching for the training tools.
+
+Expects the YOLO-style layout used by both ArSL datasets in the notebooks:
+
+    DATASET/<split>/images/*.jpg
+    DATASET/<split>/labels/*.txt   first token of the first line is the class id
+
+Features are the 21 (x, y) MediaPipe hand landmarks, the same 42 values the
+overlay feeds the model. Extraction is slow, so results are cached in an
+``.npz`` file that every evaluation run can share.
+"""
+import argparse
+import os
+import re
+
+import numpy as np
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+SPLITS = ("train", "valid", "test")
+
+
+def label_path_for(label_folder, img_name):
+    stem = img_name.rsplit('.', 1)[0]
+    path = os.path.join(label_folder, stem + '.txt')
+    if not os.path.exists(path):
+        # Copies such as "img(1).jpg" share the label file of "img.jpg"
+        path = os.path.join(label_folder, re.sub(r'\(\d+\)', '', stem) + '.txt')
+    return path
+
+
+def iter_labelled_images(dataset_dir):
+    """Yield (image_path, class_id) for every labelled image in the dataset"""
+    for split in SPLITS:
+        img_folder = os.path.join(dataset_dir, split, "images")
+        label_folder = os.path.join(dataset_dir, split, "labels")
+        if not os.path.isdir(img_folder):
+            continue
+
+        for img_name in sorted(os.listdir(img_folder)):
+            if not img_name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            txt_path = label_path_for(label_folder, img_name)
+            if not os.path.exists(txt_path):
+                continue
+            with open(txt_path, 'r') as f:
+                first_line = f.readline().strip()
+            if first_line:
+                yield os.path.join(img_folder, img_name), int(first_line.split()[0])
+
+
+def extract_keypoints(image_path, hands):
+    """Return the 42 landmark values of the first detected hand, or None"""
+    import cv2
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    if not results.multi_hand_landmarks:
+        # Images without a detected hand are dropped, zero vectors would
+        # only teach the models a fake class
+        return None
+    keypoints = []
+    for lm in results.multi_hand_landmarks[0].landmark:
+        keypoints.extend([lm.x, lm.y])
+    return np.array(keypoints, dtype=np.float32)
+
+
+def build_features(dataset_dir):
+    """Run MediaPipe over the dataset, returning (X, y, image paths)"""
+    import mediapipe as mp
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=True,
+        max_num_hands=1,
+        min_detection_confidence=0.5
+    )
+    X, y, paths = [], [], []
+    skipped = 0
+    for image_path, class_id in iter_labelled_images(dataset_dir):
+        keypoints = extract_keypoints(image_path, hands)
+        if keypoints is None:
+            skipped += 1
+            continue
+        X.append(keypoints)
+        y.append(class_id)
+        paths.append(os.path.relpath(image_path, dataset_dir))
+    hands.close()
+    print(f"{len(X)} images processed, {skipped} without a hand skipped")
+    return np.array(X, dtype=np.float32).reshape(-1, 42), np.array(y, dtype=np.int32), np.array(paths)
+
+
+def save_features(path, X, y, paths=None, **extra):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    arrays = {"X": X, "y": y}
+    if paths is not None:
+        arrays["paths"] = paths
+    arrays.update(extra)
+    np.savez_compressed(path, **arrays)
+
+
+def load_features(cache_path, dataset_dir=None):
+    """Load cached features as a dict of arrays, extracting them first if needed"""
+    if not os.path.exists(cache_path):
+        if dataset_dir is None:
+            raise FileNotFoundError(f"No feature cache at {cache_path} and no dataset to build it from")
+        X, y, paths = build_features(dataset_dir)
+        save_features(cache_path, X, y, paths)
+    with np.load(cache_path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and cache hand landmark features")
+    parser.add_argument('dataset_dir')
+    parser.add_argument('--out', default='features.npz')
+    args = parser.parse_args()
+
+    X, y, paths = build_features(args.dataset_dir)
+    save_features(args.out, X, y, paths)
+    print(f"Saved {len(X)} samples, {len(np.unique(y))} classes to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""Versioned model registry for the sign recognition overlay.
+
+Layout on disk:
+
+    models/
+        active.json          {"version": "v2", "history": ["v1"], "shadow": null}
+        v1/
+            metadata.json    labels, input layout, backend, model file
+            model.h5
+        v2/
+            ...
+
+The overlay watches ``active.json`` and hot-swaps whenever it changes, so
+``python model_registry.py activate v2`` or ``rollback`` deploys without a
+restart. Registering a version never deploys it by itself.
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+
+import numpy as np
+
+
+DEFAULT_LABELS = ['أ','ب','ت','ث','ج','ح','خ','د','ذ','ر','ز','س','ش','ص','ض','ط','ظ','ع','غ','ف','ق','ك','ل','م','ن','ه','و','ي','لا','ى','ة','ء']
+
+INPUT_LAYOUTS = {
+    "conv1d": (1, 42, 1),
+    "flat": (1, 42),
+}
+
+BACKENDS = ("keras", "sklearn")
+
+
+def get_registry_path():
+    """Registry root shared by the overlay and this CLI.
+
+    ARSL_MODEL_REGISTRY overrides it; otherwise it is ``models/`` next to the
+    frozen executable or next to the scripts.
+    """
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.environ.get('ARSL_MODEL_REGISTRY', os.path.join(base_path, 'models'))
+
+
+class LoadedModel:
+    """A model ready for inference together with its registry metadata"""
+    def __init__(self, model, labels, input_layout="conv1d", backend="keras", version=None):
+        if input_layout not in INPUT_LAYOUTS:
+            raise ValueError(f"Unknown input layout: {input_layout}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.model = model
+        self.labels = list(labels)
+        self.input_layout = input_layout
+        self.backend = backend
+        self.version = version
+
+    def prepare(self, features):
+        """Reshape a flat 42-value landmark vector to the model's input layout"""
+        return np.asarray(features, dtype=np.float32).reshape(INPUT_LAYOUTS[self.input_layout])
+
+    def predict(self, inputs):
+        """Return the class probabilities for one prepared sample"""
+        if self.backend == "keras":
+            # Calling the model directly skips the per-call dataset setup of predict()
+            return self.model(inputs, training=False).numpy()[0]
+        return self.model.predict_proba(inputs.reshape(1, -1))[0]
+
+    def warm_up(self, runs=3):
+        """Run a few dummy predictions so the first real frame is not slow.
+
+        Raises ValueError when the model's output size does not match its
+        labels, so a mislabelled version is rejected before it is swapped in.
+        """
+        inputs = np.zeros(INPUT_LAYOUTS[self.input_layout], dtype=np.float32)
+        for _ in range(runs):
+            probs = self.predict(inputs)
+        if len(probs) != len(self.labels):
+            raise ValueError(f"Model outputs {len(probs)} classes but has {len(self.labels)} labels")
+
+
+def load_model_file(path, backend):
+    if backend == "keras":
+        from keras.models import load_model
+        return load_model(path)
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    # The notebooks pickle {'model': model}
+    return data['model'] if isinstance(data, dict) else data
+
+
+class ModelRegistry:
+    def __init__(self, root):
+        self.root = root
+
+    def _state_path(self):
+        return os.path.join(self.root, 'active.json')
+
+    def _read_state(self):
+        try:
+            with open(self._state_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"version": None, "history": [], "shadow": None}
+
+    def _write_state(self, state):
+        # Write then rename so the watcher never sees a half-written file
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._state_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._state_path())
+
+    def versions(self):
+        """Registered versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            if os.path.exists(os.path.join(self.root, name, 'metadata.json')):
+                found.append((self.read_metadata(name).get('created', 0), name))
+        return [name for _, name in sorted(found)]
+
+    def read_metadata(self, version):
+        with open(os.path.join(self.root, version, 'metadata.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def active_version(self):
+        """The activated version, or None until one is activated"""
+        return self._read_state().get('version')
+
+    def shadow_version(self):
+        return self._read_state().get('shadow')
+
+    def register(self, model_file, labels=None, version=None, input_layout="conv1d", backend="keras"):
+        """Copy a trained model into the registry as a new version"""
+        if input_layout not in INPUT_LAYOUTS:
+            raise ValueError(f"Unknown input layout: {input_layout}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if version is None:
+            version = f"v{len(self.versions()) + 1}"
+
+        version_dir = os.path.join(self.root, version)
+        if os.path.exists(version_dir):
+            raise ValueError(f"Version already registered: {version}")
+        os.makedirs(version_dir)
+
+        file_name = os.path.basename(model_file)
+        shutil.copy2(model_file, os.path.join(version_dir, file_name))
+        metadata = {
+            "version": version,
+            "model_file": file_name,
+            "labels": list(labels or DEFAULT_LABELS),
+            "input_layout": input_layout,
+            "backend": backend,
+            "created": time.time(),
+        }
+        with open(os.path.join(version_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        return version
+
+    def activate(self, version):
+        if version not in self.versions():
+            raise ValueError(f"Unknown version: {version}")
+        state = self._read_state()
+        current = state.get('version')
+        if current == version:
+            return
+        history = state.get('history', [])
+        if current:
+            history.append(current)
+        state.update(version=version, history=history)
+        if state.get('shadow') == version:
+            state['shadow'] = None
+        self._write_state(state)
+
+    def rollback(self):
+        """Re-activate the version that was active before the current one"""
+        state = self._read_state()
+        history = state.get('history', [])
+        if not history:
+            raise ValueError("No previous version to roll back to")
+        state['version'] = history.pop()
+        state['history'] = history
+        self._write_state(state)
+        return state['version']
+
+    def set_shadow(self, version):
+        """Score ``version`` alongside the active model, or stop with None"""
+        if version is not None and version not in self.versions():
+            raise ValueError(f"Unknown version: {version}")
+        state = self._read_state()
+        state['shadow'] = version
+        self._write_state(state)
+
+    def load(self, version):
+        metadata = self.read_metadata(version)
+        path = os.path.join(self.root, version, metadata['model_file'])
+        backend = metadata.get('backend', 'keras')
+        return LoadedModel(
+            load_model_file(path, backend),
+            metadata.get('labels', DEFAULT_LABELS),
+            metadata.get('input_layout', 'conv1d'),
+            backend,
+            version
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the sign model registry")
+    parser.add_argument('--root', default=get_registry_path())
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list')
+
+    register = commands.add_parser('register')
+    register.add_argument('model_file')
+    register.add_argument('--version')
+    register.add_argument('--labels', help="JSON file with the label list, model output order")
+    register.add_argument('--input-layout', default='conv1d', choices=list(INPUT_LAYOUTS))
+    register.add_argument('--backend', default='keras', choices=list(BACKENDS))
+    register.add_argument('--activate', action='store_true')
+
+    activate = commands.add_parser('activate')
+    activate.add_argument('version')
+
+    commands.add_parser('rollback')
+
+    shadow = commands.add_parser('shadow')
+    shadow.add_argument('version', nargs='?', help="Omit to stop shadow scoring")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.root)
+    try:
+        run_command(registry, args)
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+
+
+def run_command(registry, args):
+    if args.command == 'list':
+        active = registry.active_version()
+        shadow_version = registry.shadow_version()
+        for version in registry.versions():
+            metadata = registry.read_metadata(version)
+            marker = "*" if version == active else ("s" if version == shadow_version else " ")
+            print(f"{marker} {version}  {metadata['backend']:8s} {metadata['input_layout']:7s} "
+                  f"{len(metadata['labels'])} labels  {metadata['model_file']}")
+    elif args.command == 'register':
+        labels = None
+        if args.labels:
+            with open(args.labels, 'r', encoding='utf-8') as f:
+                labels = json.load(f)
+        version = registry.register(args.model_file, labels, args.version,
+                                    args.input_layout, args.backend)
+        print(f"Registered {version}")
+        if args.activate:
+            registry.activate(version)
+            print(f"Activated {version}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"Activated {args.version}")
+    elif args.command == 'rollback':
+        print(f"Rolled back to {registry.rollback()}")
+    elif args.command == 'shadow':
+        registry.set_shadow(args.version)
+        print(f"Shadow: {args.version or 'off'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+import os
+import numpy as np
+import tensorflow as tf
+
+
+class EmbeddingIndex:
+    """In-memory nearest-neighbour index over L2-normalized embeddings.
+
+    Vectors live in a pre-allocated float32 array that doubles in size when
+    full, so inserts are amortized O(1) and a query is one BLAS matrix-vector
+    product with no conversion. They are saved as float16 to keep
+    calibration files small.
+    """
+    def __init__(self, dim, capacity=1024):
+        self.dim = dim
+        self.size = 0
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.labels = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, needed):
+        capacity = len(self.vectors)
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        labels = np.zeros(capacity, dtype=np.int32)
+        vectors[:self.size] = self.vectors[:self.size]
+        labels[:self.size] = self.labels[:self.size]
+        self.vectors = vectors
+        self.labels = labels
+
+    def add(self, embedding, label):
+        """Insert a single embedding with its class index"""
+        if self.size + 1 > len(self.vectors):
+            self._grow(self.size + 1)
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        self.vectors[self.size] = vector
+        self.labels[self.size] = label
+        self.size += 1
+
+    def count(self, label):
+        """Number of stored samples for a class index"""
+        return int(np.count_nonzero(self.labels[:self.size] == label))
+
+    def remove_label(self, label):
+        """Drop every sample of a class, e.g. before re-recording it"""
+        keep = self.labels[:self.size] != label
+        kept = int(np.count_nonzero(keep))
+        self.vectors[:kept] = self.vectors[:self.size][keep]
+        self.labels[:kept] = self.labels[:self.size][keep]
+        self.size = kept
+
+    def clear(self):
+        self.size = 0
+
+    def search(self, embedding, k=5):
+        """Return (labels, cosine similarities) of the k nearest samples"""
+        if self.size == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        sims = self.vectors[:self.size] @ query
+        k = min(k, self.size)
+        if k < self.size:
+            top = np.argpartition(-sims, k - 1)[:k]
+        else:
+            top = np.arange(self.size)
+        top = top[np.argsort(-sims[top])]
+        return self.labels[top], sims[top]
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path,
+                            vectors=self.vectors[:self.size].astype(np.float16),
+                            labels=self.labels[:self.size])
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        vectors = data["vectors"]
+        index = cls(vectors.shape[1], capacity=max(1024, len(vectors)))
+        index.vectors[:len(vectors)] = vectors
+        index.labels[:len(vectors)] = data["labels"]
+        index.size = len(vectors)
+        return index
+
+
+class SignerPersonalizer:
+    """Blend the fixed CNN with k-NN votes from a user's calibration samples.
+
+    The loaded model is wrapped so a single forward pass returns both the
+    softmax and the penultimate-layer embedding; the embedding is what gets
+    stored during calibration and queried during recognition.
+
+    Only neighbours with a similarity of at least ``min_similarity`` vote.
+    When the votes for one letter add up to ``min_similarity`` or more, the
+    neighbourhood is close and unanimous and overrides the model, so a
+    confident misread of a calibrated letter is corrected. Weaker votes can
+    only raise a letter's score, so uncalibrated letters and confident
+    predictions behave as before.
+    """
+    def __init__(self, model, num_classes, k=5, blend_weight=1.0,
+                 min_similarity=0.9, max_samples_per_label=60):
+        self.num_classes = num_classes
+        self.k = k
+        self.blend_weight = blend_weight
+        self.min_similarity = min_similarity
+        self.max_samples_per_label = max_samples_per_label
+
+        self.model = tf.keras.Model(
+            inputs=model.inputs,
+            outputs=[model.layers[-2].output, model.output]
+        )
+        self.index = EmbeddingIndex(self.model.outputs[0].shape[-1])
+
+    def is_active(self):
+        return len(self.index) > 0
+
+    def forward(self, landmarks):
+        """Return (embedding, probabilities) for one (1, 42, 1) sample"""
+        embedding, pred = self.model(landmarks, training=False)
+        return embedding.numpy()[0], pred.numpy()[0]
+
+    def add_sample(self, embedding, label):
+        """Store a calibration sample, returning False once the label is full"""
+        if self.index.count(label) >= self.max_samples_per_label:
+            return False
+        self.index.add(embedding, label)
+        return True
+
+    def knn_votes(self, embedding):
+        """Per-class score from the nearest stored samples.
+
+        Each close enough neighbour adds its similarity divided by k, so k
+        unanimous neighbours at similarity 0.95 give their letter 0.95, while
+        distant or split neighbourhoods give little.
+        """
+        votes = np.zeros(self.num_classes, dtype=np.float32)
+        labels, sims = self.index.search(embedding, self.k)
+        close = sims >= self.min_similarity
+        np.add.at(votes, labels[close], sims[close] / self.k)
+        return votes
+
+    def blend(self, embedding, pred):
+        """Combine the model's scores with the user's own samples.
+
+        With a total vote mass ``w``, a close unanimous neighbourhood
+        (top letter's votes >= min_similarity) returns the convex mix
+        ``(1 - w) * pred + votes``, which still sums to one and puts at least
+        ``min_similarity`` on the voted letter. Otherwise each letter keeps
+        the larger of its model score and ``blend_weight`` times its votes.
+        """
+        if not self.is_active():
+            return pred
+        votes = self.knn_votes(embedding)
+        if not votes.any():
+            return pred
+        if votes.max() >= self.min_similarity:
+            return (1.0 - votes.sum()) * pred + votes
+        # A maximum rather than a weighted mean: letters without samples keep
+        # the model's score, and a confident prediction is never pulled down
+        return np.maximum(pred, self.blend_weight * votes)
+
+    def save(self, path):
+        self.index.save(path)
+
+    def load(self, path):
+        if not os.path.exists(path):
+            return False
+        index = EmbeddingIndex.load(path)
+        if index.dim != self.index.dim:
+            print(f"Ignoring calibration with embedding size {index.dim}, "
+                  f"model expects {self.index.dim}")
+            return False
+        self.index = index
+        return True
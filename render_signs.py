@@ -0,0 +1,344 @@
+"""Render text documents or subtitle files to sign-sequence videos offline.
+
+The text is split into segments (subtitle cues, lines, or chunks of about
+``--segment-chars`` characters). Each segment is tokenized against
+``WORD_TO_IMAGE``, composed from sign images decoded once per worker, and
+encoded in its own process. The segments are then joined into one video.
+Example:
+
+    python render_signs.py transcript.srt --out transcript.mp4 --workers 8
+    python render_signs.py story.txt --out story.gif --font NotoNaskhArabic-Regular.ttf
+
+Arabic captions need Pillow and an Arabic TrueType font (``--font``), plus
+``arabic_reshaper`` and ``python-bidi`` for correct letter joining. Without
+them the caption shows the sign image name instead.
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from sign_assets import WORD_TO_IMAGE, SIGNS_PATH
+from word_completion import normalize
+
+
+CAPTION_HEIGHT = 80
+
+# Multi-letter signs for the definite article, only used where a word starts
+ARTICLES = {'ال'}
+
+# Expected tokenizations, verified with --check
+TOKENIZE_EXAMPLES = [
+    ("مال", ['م', 'ا', 'ل']),
+    ("بالعالم", ['ب', 'ا', 'ل', 'ع', 'ا', 'ل', 'م']),
+    ("العالم", ['ال', 'ع', 'ا', 'ل', 'م']),
+    ("إلى", ['ا', 'ل', 'ى']),
+    ("آخر أمس", ['ا', 'خ', 'ر', ' ', 'أ', 'م', 'س']),
+    ("لا الكتاب", ['لا', ' ', 'ال', 'ك', 'ت', 'ا', 'ب']),
+    ("مستشفى 24!", ['م', 'س', 'ت', 'ش', 'ف', 'ى', ' ']),
+]
+
+
+def read_segments(path, segment_chars):
+    """Split a .txt, .srt or .vtt file into text segments to render independently"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        content = f.read()
+
+    if path.lower().endswith(('.srt', '.vtt')):
+        segments = []
+        for block in re.split(r'\n\s*\n', content):
+            lines = [line.strip() for line in block.strip().splitlines()]
+            # Drop cue numbers, timings and the WEBVTT header
+            lines = [line for line in lines
+                     if line and '-->' not in line and not line.isdigit() and line != 'WEBVTT']
+            if lines:
+                segments.append(re.sub(r'<[^>]+>', '', " ".join(lines)))
+    else:
+        segments = [line.strip() for line in content.splitlines() if line.strip()]
+
+    # Split long lines so one paragraph does not end up on a single core
+    chunks = []
+    for segment in segments:
+        words = segment.split()
+        chunk = []
+        for word in words:
+            chunk.append(word)
+            if sum(len(w) + 1 for w in chunk) >= segment_chars:
+                chunks.append(" ".join(chunk))
+                chunk = []
+        if chunk:
+            chunks.append(" ".join(chunk))
+    return chunks
+
+
+def tokenize(text, word_to_image):
+    """Greedy longest match of ``text`` against the sign image keys.
+
+    Article signs only match at the start of a word, so the ال inside مال
+    is spelled letter by letter. A single letter without its own sign is
+    retried in normalized spelling, so إ and آ are shown with the sign for ا.
+    """
+    max_len = max(len(key) for key in word_to_image)
+    text = re.sub(r'\s+', ' ', text.strip())
+    tokens = []
+    i = 0
+    while i < len(text):
+        word_start = i == 0 or text[i - 1] == ' '
+        for size in range(max_len, 0, -1):
+            piece = text[i:i + size]
+            if piece in ARTICLES and not word_start:
+                continue
+            if size == 1 and piece not in word_to_image:
+                piece = normalize(piece)
+            if piece in word_to_image:
+                # Skipped characters can leave two spaces in a row
+                if not (piece == " " and tokens and tokens[-1] == " "):
+                    tokens.append(piece)
+                i += size
+                break
+        else:
+            i += 1  # no sign for this character (digits, punctuation, Latin)
+    return tokens
+
+
+class CaptionRenderer:
+    """Draw caption text, in Arabic when a font is available"""
+    def __init__(self, font_path=None, font_size=36):
+        self.font = None
+        self.shape = lambda text: text
+        if not font_path:
+            return
+        try:
+            from PIL import ImageFont
+            self.font = ImageFont.truetype(font_path, font_size)
+        except (ImportError, OSError) as e:
+            print(f"Arabic captions disabled: {e}")
+            return
+        try:
+            import arabic_reshaper
+            from bidi.algorithm import get_display
+            self.shape = lambda text: get_display(arabic_reshaper.reshape(text))
+        except ImportError:
+            print("arabic_reshaper/python-bidi not installed, Arabic letters will not join")
+
+    def draw(self, canvas, text, fallback):
+        """Draw ``text`` centred in an RGB canvas, or ``fallback`` without a font"""
+        if self.font is None:
+            scale, thickness = 1.0, 2
+            (w, h), _ = cv2.getTextSize(fallback, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            x = max(0, (canvas.shape[1] - w) // 2)
+            y = (canvas.shape[0] + h) // 2
+            cv2.putText(canvas, fallback, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale,
+                        (255, 255, 255), thickness, cv2.LINE_AA)
+            return canvas
+
+        from PIL import Image, ImageDraw
+        image = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(image)
+        shaped = self.shape(text)
+        left, top, right, bottom = draw.textbbox((0, 0), shaped, font=self.font)
+        x = (canvas.shape[1] - (right - left)) // 2 - left
+        y = (canvas.shape[0] - (bottom - top)) // 2 - top
+        draw.text((x, y), shaped, font=self.font, fill=(255, 255, 255))
+        return np.asarray(image)
+
+
+def load_sign_images(signs_path, word_to_image, size):
+    """Decode and letterbox every sign image once, keyed by token"""
+    width, height = size
+    image_height = height - CAPTION_HEIGHT
+    decoded = {}
+    images = {}
+    for token, file_name in word_to_image.items():
+        if file_name not in decoded:
+            canvas = np.full((image_height, width, 3), 255, dtype=np.uint8)
+            img = cv2.imread(os.path.join(signs_path, file_name))
+            if img is None:
+                print(f"Image not found: {file_name}")
+            else:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                scale = min(width / img.shape[1], image_height / img.shape[0])
+                new_w, new_h = int(img.shape[1] * scale), int(img.shape[0] * scale)
+                img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+                x, y = (width - new_w) // 2, (image_height - new_h) // 2
+                canvas[y:y + new_h, x:x + new_w] = img
+            decoded[file_name] = canvas
+        images[token] = decoded[file_name]
+    return images
+
+
+# Per-process state, set up once by init_worker
+worker = {}
+
+
+def init_worker(signs_path, word_to_image, size, font_path):
+    worker["word_to_image"] = word_to_image
+    worker["images"] = load_sign_images(signs_path, word_to_image, size)
+    worker["captions"] = CaptionRenderer(font_path)
+
+
+def compose_frame(token, cache):
+    """Sign image with its caption strip, cached per token within a segment"""
+    frame = cache.get(token)
+    if frame is None:
+        image = worker["images"][token]
+        strip = np.zeros((CAPTION_HEIGHT, image.shape[1], 3), dtype=np.uint8)
+        fallback = os.path.splitext(worker["word_to_image"][token])[0]
+        strip = worker["captions"].draw(strip, token if token != " " else "␣", fallback)
+        frame = cache[token] = np.vstack([image, strip])
+    return frame
+
+
+def render_segment(job):
+    """Encode one segment to its own file and return (index, path, frames, seconds)"""
+    index, text, out_path, fps, display_time = job
+    tokens = tokenize(text, worker["word_to_image"])
+    if not tokens:
+        return index, None, 0, 0.0
+    # Segments break at spaces or line ends, so show the space between them
+    if index > 0 and tokens[0] != " " and " " in worker["word_to_image"]:
+        tokens.insert(0, " ")
+    repeats = max(1, int(round(display_time * fps)))
+    cache = {}
+
+    if out_path.endswith('.gif'):
+        from PIL import Image
+        # One GIF frame per sign, held for display_time, instead of repeated frames
+        frames = [Image.fromarray(compose_frame(token, cache)) for token in tokens]
+        frames[0].save(out_path, save_all=True, append_images=frames[1:],
+                       duration=int(display_time * 1000), loop=0)
+        return index, out_path, len(tokens), len(tokens) * display_time
+
+    first = compose_frame(tokens[0], cache)
+    writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*'mp4v'), fps,
+                             (first.shape[1], first.shape[0]))
+    for token in tokens:
+        frame = cv2.cvtColor(compose_frame(token, cache), cv2.COLOR_RGB2BGR)
+        for _ in range(repeats):
+            writer.write(frame)
+    writer.release()
+    return index, out_path, len(tokens) * repeats, len(tokens) * repeats / fps
+
+
+def check_tokenize(word_to_image):
+    """Compare tokenize() with the expected tokens in TOKENIZE_EXAMPLES"""
+    ok = True
+    for text, expected in TOKENIZE_EXAMPLES:
+        tokens = tokenize(text, word_to_image)
+        if tokens != expected:
+            print(f"Mismatch for {text!r}: {tokens} != {expected}")
+            ok = False
+    if ok:
+        print(f"All {len(TOKENIZE_EXAMPLES)} tokenizations match")
+    return ok
+
+
+def concat_mp4(paths, out_path, fps):
+    """Join segment videos, by stream copy with ffmpeg when it is installed"""
+    if shutil.which('ffmpeg'):
+        list_path = out_path + '.txt'
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+        subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                        '-i', list_path, '-c', 'copy', out_path], check=True)
+        os.remove(list_path)
+        return
+
+    writer = None
+    for path in paths:
+        capture = cv2.VideoCapture(path)
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if writer is None:
+                writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*'mp4v'), fps,
+                                         (frame.shape[1], frame.shape[0]))
+            writer.write(frame)
+        capture.release()
+    if writer is not None:
+        writer.release()
+
+
+def concat_gif(paths, out_path):
+    from PIL import Image, ImageSequence
+    frames, durations = [], []
+    for path in paths:
+        with Image.open(path) as gif:
+            for frame in ImageSequence.Iterator(gif):
+                frames.append(frame.copy())
+                durations.append(frame.info.get('duration', 1000))
+    frames[0].save(out_path, save_all=True, append_images=frames[1:], duration=durations, loop=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render text to a sign-sequence video")
+    parser.add_argument('input', nargs='?', help=".txt document or .srt/.vtt subtitle file")
+    parser.add_argument('--out', default='signs.mp4', help="Output .mp4 or .gif")
+    parser.add_argument('--signs-path', default=SIGNS_PATH)
+    parser.add_argument('--size', default='480x560', help="WIDTHxHEIGHT, caption strip included")
+    parser.add_argument('--fps', type=float, default=10.0)
+    parser.add_argument('--display-time', type=float, default=1.0, help="Seconds per sign")
+    parser.add_argument('--font', help="TrueType font with Arabic glyphs for captions")
+    parser.add_argument('--segment-chars', type=int, default=200,
+                        help="Approximate characters per parallel segment")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--check', action='store_true',
+                        help="Verify the tokenizer against the built-in examples and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        return 0 if check_tokenize(WORD_TO_IMAGE) else 1
+    if not args.input:
+        parser.error("input is required")
+
+    if not args.out.endswith(('.mp4', '.gif')):
+        parser.error("--out must end in .mp4 or .gif")
+    width, height = (int(v) for v in args.size.split('x'))
+    # mp4v needs even frame sizes
+    size = (width - width % 2, height - height % 2)
+    extension = os.path.splitext(args.out)[1]
+
+    segments = read_segments(args.input, args.segment_chars)
+    if not segments:
+        print("Nothing to render")
+        return
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs = [(i, text, os.path.join(tmp_dir, f"segment_{i:05d}{extension}"), args.fps, args.display_time)
+                for i, text in enumerate(segments)]
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                 initargs=(args.signs_path, WORD_TO_IMAGE, size, args.font)) as pool:
+            results = sorted(pool.map(render_segment, jobs))
+        encode_time = time.perf_counter() - start
+
+        paths = [path for _, path, _, _ in results if path]
+        total_frames = sum(frames for _, _, frames, _ in results)
+        video_seconds = sum(seconds for _, _, _, seconds in results)
+        if not paths:
+            print("No signs found in the text")
+            return
+        if extension == '.gif':
+            concat_gif(paths, args.out)
+        else:
+            concat_mp4(paths, args.out, args.fps)
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(segments)} segments, {total_frames} frames ({video_seconds / 60:.1f} min of video)")
+    print(f"Encoded in {encode_time:.1f}s, total {elapsed:.1f}s: "
+          f"{total_frames / elapsed:.0f} frames/s, {video_seconds / elapsed:.0f}x real time")
+    print(f"Saved to {args.out}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+# Sign image for every letter, shared by the overlay and the batch renderer
+WORD_TO_IMAGE = {
+    "ا": "aleff.jpeg", "أ": "aleff.jpeg", "ب": "bb.jpeg", "ت": "ta.jpeg",
+    "ث": "thea.jpeg", "ج": "jeem.jpeg", "ح": "ha.jpeg", "خ": "khaa.jpeg",
+    "د": "daal.jpeg", "ذ": "thal.jpeg", "ر": "ra'.jpeg", "ز": "zay.jpeg",
+    "س": "seen.jpeg", "ش": "sheen.jpeg", "ص": "saad.jpeg", "ض": "daad.jpeg",
+    "ط": "taah.jpeg", "ظ": "thaa.jpeg", "ع": "ain.jpeg", "غ": "ghain.jpeg",
+    "ف": "fa.jpeg", "ق": "k'af.jpeg", "ك": "kaaf.jpeg", "ل": "laam.jpeg",
+    "م": "meem.jpeg", "ن": "nun.jpeg", "ه": "haa'.jpeg", "و": "waaw.jpeg",
+    "ي": "yaa.jpeg", "لا": "la.jpeg", "ة": "ta marboota.jpeg",
+    "ال": "alif_lam.jpeg", "ء": "hamza.jpeg", "ى": "yaa.jpeg", " ": "space.jpeg"
+}
+
+# Path to sign images
+SIGNS_PATH = r"D:\visual\Python\DEPI machine\Final Project\ARABIC"
@@ -0,0 +1,245 @@
+"""Headless soak test for the recognition loop.
+
+Drives ``IconUI`` with synthetic frames and hand landmarks for a fixed
+duration, sampling memory and per-frame latency, and exits non-zero if
+either drifts past its threshold. Frames go through ``process_frame`` with
+the screen grab stubbed out, so the capture and conversion path is soaked
+too. Example:
+
+    python soak_benchmark.py --minutes 30 --csv soak.csv
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import collections
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+import integeration_gui
+from integeration_gui import IconUI, ScreenCaptureWindow
+
+
+def rss_mb():
+    """Current resident set size in MB, or None if it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def object_counts():
+    return collections.Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+class SyntheticHand:
+    """Landmark stream that holds one random hand shape for a few seconds,
+    then jitters to the next, so letters keep getting committed"""
+    def __init__(self, num_shapes=32, hold_seconds=2.5, jitter=0.005, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.shapes = self.rng.uniform(0.2, 0.8, size=(num_shapes, 42)).astype(np.float32)
+        self.hold_seconds = hold_seconds
+        self.jitter = jitter
+
+    def landmarks(self, elapsed):
+        shape = self.shapes[int(elapsed / self.hold_seconds) % len(self.shapes)]
+        return shape + self.rng.normal(0, self.jitter, size=42).astype(np.float32)
+
+
+class SyntheticScreen:
+    """Stands in for the primary screen, returning synthetic frames from grabWindow"""
+    def __init__(self, screen, frames):
+        self.screen = screen
+        # QImage does not copy the array, so keep the arrays alive with the pixmaps
+        self.frames = frames
+        self.pixmaps = [
+            QPixmap.fromImage(QImage(frame.data, frame.shape[1], frame.shape[0],
+                                     3 * frame.shape[1], QImage.Format_RGB888))
+            for frame in frames
+        ]
+        self.grabs = 0
+
+    def grabWindow(self, window_id, x, y, width, height):
+        pixmap = self.pixmaps[self.grabs % len(self.pixmaps)]
+        self.grabs += 1
+        return pixmap
+
+    def __getattr__(self, name):
+        return getattr(self.screen, name)
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q)) * 1000 if latencies else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-run stability test for the recognition loop")
+    parser.add_argument('--minutes', type=float, default=30.0)
+    parser.add_argument('--fps', type=float, default=33.0, help="Frame rate of the overlay timer")
+    parser.add_argument('--mode', default='both', choices=['landmarks', 'frames', 'both'],
+                        help="Feed synthetic landmarks, synthetic screen grabs through "
+                             "process_frame and MediaPipe, or both")
+    parser.add_argument('--frame-size', default='400x300', help="WIDTHxHEIGHT of synthetic screen grabs")
+    parser.add_argument('--sample-seconds', type=float, default=30.0)
+    parser.add_argument('--warmup-seconds', type=float, default=60.0,
+                        help="Baseline is taken after this, once caches and lazy init settle")
+    parser.add_argument('--max-rss-growth-mb', type=float, default=50.0)
+    parser.add_argument('--max-p99-growth', type=float, default=1.5,
+                        help="Allowed ratio of final to baseline p99 latency")
+    parser.add_argument('--no-tracemalloc', action='store_true')
+    parser.add_argument('--top', type=int, default=10, help="Allocators and object types to report")
+    parser.add_argument('--csv')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    window = IconUI()
+    if not window.model:
+        print("No model loaded, nothing to soak")
+        return 2
+
+    width, height = (int(v) for v in args.frame_size.split('x'))
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8) for _ in range(8)]
+    hand = SyntheticHand()
+
+    if args.mode in ('frames', 'both'):
+        window.capture_window = ScreenCaptureWindow()
+        window.capture_window.setGeometry(100, 100, width, height)
+        screen = SyntheticScreen(QApplication.primaryScreen(), frames)
+
+        class SyntheticApplication(QApplication):
+            @staticmethod
+            def primaryScreen():
+                return screen
+
+        # process_frame looks QApplication up in its module on every call
+        integeration_gui.QApplication = SyntheticApplication
+
+    if not args.no_tracemalloc:
+        tracemalloc.start(10)
+
+    frame_interval = 1.0 / args.fps
+    duration = args.minutes * 60
+    samples = []
+    window_latencies = []
+    baseline = None
+    baseline_snapshot = None
+    baseline_objects = None
+
+    start = time.perf_counter()
+    next_sample = start + args.sample_seconds
+    frame_index = 0
+
+    print(f"Soaking for {args.minutes:g} min at {args.fps:g} FPS ({args.mode})")
+    while True:
+        tick = time.perf_counter()
+        elapsed = tick - start
+        if elapsed >= duration:
+            break
+
+        if args.mode in ('frames', 'both'):
+            window.process_frame()
+        if args.mode in ('landmarks', 'both'):
+            window.process_landmarks(hand.landmarks(elapsed))
+        # Let Qt run deferred deletes and repaints like the real event loop
+        app.processEvents()
+
+        window_latencies.append(time.perf_counter() - tick)
+        frame_index += 1
+
+        now = time.perf_counter()
+        if now >= next_sample:
+            sample = {
+                "elapsed_s": round(now - start, 1),
+                "frames": frame_index,
+                "rss_mb": rss_mb(),
+                "traced_mb": tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else None,
+                "objects": len(gc.get_objects()),
+                "p50_ms": percentile_ms(window_latencies, 50),
+                "p99_ms": percentile_ms(window_latencies, 99),
+                "word_length": len(window.collected_word),
+            }
+            samples.append(sample)
+            window_latencies = []
+            next_sample = now + args.sample_seconds
+            print(" ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                           for k, v in sample.items()))
+
+            if baseline is None and now - start >= args.warmup_seconds:
+                baseline = sample
+                if tracemalloc.is_tracing():
+                    baseline_snapshot = tracemalloc.take_snapshot()
+                baseline_objects = object_counts()
+
+        remaining = frame_interval - (time.perf_counter() - tick)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    window.model_watcher.stop()
+    window.model_watcher.wait()
+
+    if args.csv and samples:
+        with open(args.csv, 'w', encoding='utf-8') as f:
+            f.write(",".join(samples[0]) + "\n")
+            for sample in samples:
+                f.write(",".join("" if v is None else str(v) for v in sample.values()) + "\n")
+
+    if baseline is None or samples[-1] is baseline:
+        print("Run too short for a baseline after warm-up, increase --minutes")
+        return 2
+    final = samples[-1]
+
+    if baseline_snapshot is not None:
+        print(f"\nTop {args.top} allocation growth since baseline:")
+        stats = tracemalloc.take_snapshot().compare_to(baseline_snapshot, 'traceback')
+        for stat in stats[:args.top]:
+            print(f"  {stat.size_diff / 1024:+.1f} KiB in {stat.count_diff:+d} blocks")
+            for line in stat.traceback.format(limit=3):
+                print(f"    {line}")
+
+    print(f"\nTop {args.top} object type growth since baseline:")
+    growth = object_counts()
+    growth.subtract(baseline_objects)
+    for name, count in growth.most_common(args.top):
+        print(f"  {name}: {count:+d}")
+
+    failures = []
+    if final["rss_mb"] is not None and baseline["rss_mb"] is not None:
+        rss_growth = final["rss_mb"] - baseline["rss_mb"]
+        print(f"\nRSS: {baseline['rss_mb']:.1f} -> {final['rss_mb']:.1f} MB ({rss_growth:+.1f})")
+        if rss_growth > args.max_rss_growth_mb:
+            failures.append(f"RSS grew {rss_growth:.1f} MB (limit {args.max_rss_growth_mb:g})")
+    else:
+        print("\nRSS unavailable on this platform, install psutil to check it")
+
+    p99_ratio = final["p99_ms"] / baseline["p99_ms"] if baseline["p99_ms"] else 1.0
+    print(f"p99 latency: {baseline['p99_ms']:.2f} -> {final['p99_ms']:.2f} ms (x{p99_ratio:.2f})")
+    if p99_ratio > args.max_p99_growth:
+        failures.append(f"p99 latency grew x{p99_ratio:.2f} (limit x{args.max_p99_growth:g})")
+
+    if args.mode in ('frames', 'both') and screen.grabs < frame_index:
+        failures.append(f"process_frame grabbed {screen.grabs} of {frame_index} frames")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASS")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
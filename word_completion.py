@@ -0,0 +1,150 @@
+"""Prefix-trie word completion over the recognizer's letter probabilities.
+
+Every node of the trie caches its best few completions by frequency, so
+looking up a prefix never walks the subtree. The completer keeps a small
+beam of candidate prefixes built from the top-k letters of each committed
+frame, so a misread letter can still reach the intended word. Each letter
+costs ``beam_width * k`` dictionary lookups, well under a millisecond.
+"""
+import math
+import os
+
+
+# The model and the lexicon may spell alef and final yaa differently
+NORMALIZE = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ى': 'ي'})
+
+
+def normalize(text):
+    return text.translate(NORMALIZE)
+
+
+class TrieNode:
+    __slots__ = ('children', 'weight', 'word', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.weight = 0.0
+        self.word = None
+        self.top = ()
+
+
+class PrefixTrie:
+    def __init__(self, top_k=5):
+        self.root = TrieNode()
+        self.top_k = top_k
+        self.total_weight = 0.0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, word, weight=1.0):
+        node = self.root
+        for char in normalize(word):
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if node.word is None:
+            self.size += 1
+        node.word = word
+        node.weight += weight
+        self.total_weight += weight
+
+    def finalize(self):
+        """Cache the best completions at every node, bottom-up"""
+        stack = [(self.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            candidates = [entry for child in node.children.values() for entry in child.top]
+            if node.word is not None:
+                candidates.append((node.weight, node.word))
+            candidates.sort(reverse=True)
+            node.top = tuple(candidates[:self.top_k])
+
+    def walk(self, node, text):
+        """Follow ``text`` from ``node``, returning None when it leaves the trie"""
+        for char in normalize(text):
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    @classmethod
+    def load(cls, path, top_k=5):
+        """Read one word per line, optionally followed by its frequency.
+
+        Words without a count are weighted by rank, so a plain list ordered
+        from most to least common works too. Lines starting with # are skipped.
+        """
+        trie = cls(top_k)
+        with open(path, 'r', encoding='utf-8') as f:
+            rank = 0
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith('#'):
+                    continue
+                rank += 1
+                weight = float(parts[1]) if len(parts) > 1 else 1.0 / rank
+                trie.insert(parts[0], weight)
+        trie.finalize()
+        return trie
+
+
+class WordCompleter:
+    """Incremental beam search over the trie, one committed letter at a time"""
+    def __init__(self, trie, beam_width=8, max_completions=3, min_prob=0.01):
+        self.trie = trie
+        self.beam_width = beam_width
+        self.max_completions = max_completions
+        self.min_prob = min_prob
+        self.reset()
+
+    def reset(self):
+        """Start a new word"""
+        self.beams = [(self.trie.root, 0.0)]
+
+    def _extend(self, beams, candidates):
+        extended = []
+        for node, score in beams:
+            for letter, prob in candidates:
+                if prob < self.min_prob:
+                    continue
+                child = self.trie.walk(node, letter)
+                if child is not None:
+                    extended.append((child, score + math.log(prob)))
+        extended.sort(key=lambda beam: beam[1], reverse=True)
+        return extended[:self.beam_width]
+
+    def push(self, candidates):
+        """Extend the beam with (letter, probability) pairs for the next letter.
+
+        Returns False once no known word continues the prefix. The beam then
+        stays empty until ``reset`` marks a word boundary, since letters
+        alone never tell where the next word starts.
+        """
+        self.beams = self._extend(self.beams, candidates)
+        return bool(self.beams)
+
+    def completions(self):
+        """Best whole words for the current beam, most likely first"""
+        scores = {}
+        total = self.trie.total_weight or 1.0
+        for node, score in self.beams:
+            for weight, word in node.top:
+                word_score = score + math.log(weight / total)
+                if word_score > scores.get(word, -math.inf):
+                    scores[word] = word_score
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return ranked[:self.max_completions]
+
+
+def load_completer(path, **kwargs):
+    """Build a completer from a lexicon file, or None if it is missing"""
+    if not os.path.exists(path):
+        return None
+    return WordCompleter(PrefixTrie.load(path), **kwargs)